@@ -1,150 +1,365 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
 
 # ==================================================
 # 1. LOAD & CLEAN
 # ==================================================
 
-def load_and_clean_csv(path):
-    df = pd.read_csv(path)
-    df.columns = df.columns.str.strip().str.lower()
+AGE_GROUPS = ["0_5", "5_17", "18_plus"]
 
-    # Robust date parsing (UIDAI-safe)
-    df["date"] = pd.to_datetime(
-        df["date"],
-        errors="coerce",
-        dayfirst=True
-    )
+# pandas' default NA markers, so blank / "NA" cells load as missing
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+]
 
-    df = df.dropna(subset=["date"])
-    return df
+# Day-first layouts seen in UIDAI exports, plus ISO
+DATE_FORMATS = ["%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d"]
 
 
-# ==================================================
-# 2. ENROLMENT PROCESSING
-# ==================================================
+def parse_dates(dates):
+    # Pick the file's layout from a small sample, then parse with that
+    # fixed format instead of inferring it per element
+    sample = dates.dropna().head(100)
+    fmt = max(
+        DATE_FORMATS,
+        key=lambda f: pd.to_datetime(sample, format=f, errors="coerce")
+        .notna().sum()
+    )
 
-def process_enrolment_folder(folder):
-    frames = []
+    parsed = pd.to_datetime(dates, format=fmt, errors="coerce")
 
-    for file in glob(os.path.join(folder, "*.csv")):
-        df = load_and_clean_csv(file)
+    # Rows in one of the other known layouts are parsed with that exact
+    # format - dayfirst would otherwise swap month and day in ISO dates
+    for other in DATE_FORMATS:
+        missed = parsed.isna() & dates.notna()
+        if other == fmt or not missed.any():
+            continue
+        parsed[missed] = pd.to_datetime(
+            dates[missed], format=other, errors="coerce"
+        )
 
-        df_long = df.melt(
-            id_vars=["date", "state", "district", "pincode"],
-            value_vars=["age_0_5", "age_5_17", "age_18_greater"],
-            var_name="age_group",
-            value_name="count"
+    # Anything else (or unparseable) still gets the old robust
+    # mixed / dayfirst treatment
+    missed = parsed.isna() & dates.notna()
+    if missed.any():
+        parsed[missed] = pd.to_datetime(
+            dates[missed],
+            format="mixed",
+            errors="coerce",
+            dayfirst=True
         )
 
-        df_long["age_group"] = df_long["age_group"].map({
-            "age_0_5": "0_5",
-            "age_5_17": "5_17",
-            "age_18_greater": "18_plus"
-        })
+    return parsed
+
+
+def load_and_clean_csv(path, numeric_cols):
+    # Peek at the header only, so column names can be normalised before
+    # the real read selects and types just the columns melted downstream
+    raw_cols = pd.read_csv(path, nrows=0).columns
+    col_lookup = {c.strip().lower(): c for c in raw_cols}
+
+    # Numbers are read as float64 so exports that wrote them as "1.0"
+    # still load; stack_long narrows them to int32
+    schema = {
+        "date": pa.string(),
+        "state": pa.string(),
+        "district": pa.string(),
+        "pincode": pa.float64(),
+        **{col: pa.float64() for col in numeric_cols}
+    }
+
+    # Stream the file in 16 MiB record batches; only the selected columns
+    # are decoded, with pandas' NA markers treated as missing values
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=16 << 20),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[col_lookup[col] for col in schema],
+            column_types={
+                col_lookup[col]: dtype for col, dtype in schema.items()
+            },
+            null_values=NA_VALUES,
+            strings_can_be_null=True
+        )
+    )
 
-        df_long["source_type"] = "enrolment"
-        frames.append(df_long)
+    # Each batch is cleaned while it is hot and kept as its own small
+    # frame; stack_long stitches them together, so the whole file is
+    # never held as one decoded table plus a cleaned copy
+    frames = [_clean_batch(batch) for batch in reader]
 
-    return pd.concat(frames, ignore_index=True)
+    if not frames:
+        # Header-only file: keep one empty frame with the right columns
+        frames.append(_clean_batch(reader.schema.empty_table()))
 
+    return frames
 
-# ==================================================
-# 3. BIOMETRIC PROCESSING
-# ==================================================
 
-def process_biometric_folder(folder):
-    frames = []
+def _clean_batch(batch):
+    # Arrow-backed pandas columns, so the hand-off to pandas is zero-copy
+    df = batch.to_pandas(types_mapper=pd.ArrowDtype)
+    df.columns = df.columns.str.strip().str.lower()
 
-    for file in glob(os.path.join(folder, "*.csv")):
-        df = load_and_clean_csv(file)
+    # Robust date parsing (UIDAI-safe)
+    df["date"] = parse_dates(df["date"])
 
-        df_long = df.melt(
-            id_vars=["date", "state", "district", "pincode"],
-            value_vars=["bio_age_5_17", "bio_age_17_"],
-            var_name="age_group",
-            value_name="count"
-        )
+    return df.dropna(subset=["date"])
 
-        df_long["age_group"] = df_long["age_group"].map({
-            "bio_age_5_17": "5_17",
-            "bio_age_17_": "18_plus"
-        })
 
-        df_long["source_type"] = "biometric"
-        frames.append(df_long)
+def _arrow_chunks(frames, col, dtype):
+    # pa.array() hands back an Array or a ChunkedArray (with zero chunks
+    # for a header-only file) - flatten to a list of chunks of one type
+    chunks = []
+    for df in frames:
+        arr = pa.array(df[col].array).cast(dtype)
+        chunks.extend(
+            arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr]
+        )
+    return chunks
 
-    return pd.concat(frames, ignore_index=True)
 
+def stack_long(frames, value_vars, age_groups, source_type):
+    # Wide -> long in one pass: each column is concatenated across files
+    # once, then the id columns are tiled once per age group instead of
+    # melting (and re-copying) every file separately
+    n_groups = len(value_vars)
 
-# ==================================================
-# 4. DEMOGRAPHIC PROCESSING
-# ==================================================
+    date_arr = np.concatenate([df["date"].to_numpy() for df in frames])
+    state_arr = _arrow_chunks(frames, "state", pa.string())
+    district_arr = _arrow_chunks(frames, "district", pa.string())
+    pincode_arr = _arrow_chunks(frames, "pincode", pa.int32())
 
-def process_demographic_folder(folder):
-    frames = []
+    # Rows come out in blocks of one age group each, so age_group is just
+    # the block index repeated - build the 1-byte codes directly
+    codes = np.array(
+        [AGE_GROUPS.index(age_groups[col]) for col in value_vars],
+        dtype=np.int8
+    )
 
-    for file in glob(os.path.join(folder, "*.csv")):
-        df = load_and_clean_csv(file)
+    counts = np.concatenate([
+        df[col].to_numpy(dtype=np.int32, na_value=0)
+        for col in value_vars
+        for df in frames
+    ])
+
+    # Repeating the chunk list re-uses the same Arrow buffers, so the
+    # string columns are tiled without copying
+    return pd.DataFrame({
+        "date": np.tile(date_arr, n_groups),
+        "state": pd.arrays.ArrowStringArray(
+            pa.chunked_array(state_arr * n_groups, type=pa.string())
+        ),
+        "district": pd.arrays.ArrowStringArray(
+            pa.chunked_array(district_arr * n_groups, type=pa.string())
+        ),
+        "pincode": pd.arrays.ArrowExtensionArray(
+            pa.chunked_array(pincode_arr * n_groups, type=pa.int32())
+        ),
+        "age_group": pd.Categorical.from_codes(
+            np.repeat(codes, len(date_arr)), categories=AGE_GROUPS
+        ),
+        "count": counts,
+        "source_type": source_type
+    })
 
-        df_long = df.melt(
-            id_vars=["date", "state", "district", "pincode"],
-            value_vars=["demo_age_5_17", "demo_age_17_"],
-            var_name="age_group",
-            value_name="count"
-        )
 
-        df_long["age_group"] = df_long["age_group"].map({
-            "demo_age_5_17": "5_17",
-            "demo_age_17_": "18_plus"
-        })
+# ==================================================
+# 2. FOLDER PROCESSING
+# ==================================================
+
+# source_type -> {raw count column: age_group}
+SOURCES = {
+    "enrolment": {
+        "age_0_5": "0_5",
+        "age_5_17": "5_17",
+        "age_18_greater": "18_plus"
+    },
+    "biometric": {
+        "bio_age_5_17": "5_17",
+        "bio_age_17_": "18_plus"
+    },
+    "demographic": {
+        "demo_age_5_17": "5_17",
+        "demo_age_17_": "18_plus"
+    }
+}
+
+
+def _load_one(job):
+    # Module-level so ProcessPoolExecutor can pickle it into the workers;
+    # returns the file's cleaned per-batch frames
+    file, value_vars = job
+    return load_and_clean_csv(file, value_vars)
+
+
+# Bump whenever loading / stacking changes what a cached frame holds
+CACHE_VERSION = 4
+
+# dtypes stack_long produces; reapplied on a cache hit because Feather
+# round-trips the string columns differently across pandas versions
+STACKED_DTYPES = {
+    "state": "string[pyarrow]",
+    "district": "string[pyarrow]",
+    "pincode": "int32[pyarrow]",
+    "count": "int32"
+}
+
+
+def _cache_path(cache_dir, source_type, files):
+    # Keyed on the loader version, the source's columns and every file's
+    # (path, mtime, size), so a code change or editing, adding or removing
+    # a CSV in the folder produces a new key
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{CACHE_VERSION}|{source_type}\n".encode())
+    for col, age_group in SOURCES[source_type].items():
+        digest.update(f"{col}|{age_group}\n".encode())
+    for file in sorted(files):
+        stat = os.stat(file)
+        digest.update(f"{file}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+    return os.path.join(
+        cache_dir, f"{source_type}_{digest.hexdigest()}.feather"
+    )
 
-        df_long["source_type"] = "demographic"
-        frames.append(df_long)
 
-    return pd.concat(frames, ignore_index=True)
+def process_folders(folders, cache_dir=None):
+    # Every file of every (uncached) source is parsed in one shared process
+    # pool; workers hand back the (smaller) wide frames and each source is
+    # then stacked to long form once in the parent
+    files = {
+        source_type: glob(os.path.join(folder, "*.csv"))
+        for source_type, folder in folders.items()
+    }
+
+    stacked = {}
+    cache_paths = {}
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for source_type in folders:
+            path = _cache_path(cache_dir, source_type, files[source_type])
+            cache_paths[source_type] = path
+            if os.path.exists(path):
+                stacked[source_type] = (
+                    pd.read_feather(path).astype(STACKED_DTYPES)
+                )
+
+    pending = [
+        source_type for source_type in folders if source_type not in stacked
+    ]
+    jobs = [
+        (source_type, file)
+        for source_type in pending
+        for file in files[source_type]
+    ]
+
+    if jobs:
+        with ProcessPoolExecutor() as executor:
+            loaded = executor.map(
+                _load_one,
+                [
+                    (file, list(SOURCES[source_type]))
+                    for source_type, file in jobs
+                ],
+                chunksize=4
+            )
+            frames = {source_type: [] for source_type in pending}
+            for (source_type, _), batch_frames in zip(jobs, loaded):
+                frames[source_type].extend(batch_frames)
+
+        for source_type in pending:
+            df = stack_long(frames[source_type], list(SOURCES[source_type]),
+                            SOURCES[source_type], source_type)
+
+            if source_type in cache_paths:
+                # Write-then-rename so an interrupted run never leaves a
+                # truncated cache file behind
+                tmp_path = cache_paths[source_type] + ".tmp"
+                df.to_feather(tmp_path)
+                os.replace(tmp_path, cache_paths[source_type])
+
+            stacked[source_type] = df
+
+    return [stacked[source_type] for source_type in folders]
 
 
 # ==================================================
-# 5. BUILD MASTER DATASET
+# 3. BUILD MASTER DATASET
 # ==================================================
 
-def build_master_dataset(enrol_dir, bio_dir, demo_dir):
-    enrol_df = process_enrolment_folder(enrol_dir)
-    bio_df = process_biometric_folder(bio_dir)
-    demo_df = process_demographic_folder(demo_dir)
-
-    master = pd.concat([enrol_df, bio_df, demo_df], ignore_index=True)
-
-    master["count"] = master["count"].fillna(0).astype(int)
-
-    master = master.sort_values(
-        ["date", "state", "district", "pincode", "source_type", "age_group"]
-    )
+def _sort_codes(col):
+    # Missing values carry code -1; move them after every real category,
+    # matching sort_values' na_position="last"
+    codes = col.cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(col.cat.categories)
+    return codes
+
+
+def build_master_dataset(enrol_dir, bio_dir, demo_dir, cache_dir=None):
+    master = pd.concat(process_folders({
+        "enrolment": enrol_dir,
+        "biometric": bio_dir,
+        "demographic": demo_dir
+    }, cache_dir), ignore_index=True)
+
+    master["count"] = master["count"].fillna(0).astype("int32")
+
+    for col in ["state", "district", "source_type", "age_group"]:
+        master[col] = master[col].astype("category")
+
+    # Same order as sorting on the columns, but lexsorted on integer keys
+    # (category codes, date as int64) rather than comparing values
+    keys = [
+        master["date"].to_numpy().view("int64"),
+        _sort_codes(master["state"]),
+        _sort_codes(master["district"]),
+        # Widen before filling so the int64 sentinel fits the Arrow type
+        master["pincode"].astype("int64[pyarrow]").to_numpy(
+            dtype=np.int64, na_value=np.iinfo(np.int64).max
+        ),
+        _sort_codes(master["source_type"]),
+        _sort_codes(master["age_group"])
+    ]
+    order = np.lexsort(keys[::-1])
+    master = master.iloc[order].reset_index(drop=True)
 
     return master
 
 
 # ==================================================
-# 6. RUN SCRIPT
+# 4. RUN SCRIPT
 # ==================================================
 
 if __name__ == "__main__":
     ENROLMENT_DIR = r"C:\Users\User\Desktop\UIDAI Hackathon\enrolment"
     BIOMETRIC_DIR = r"C:\Users\User\Desktop\UIDAI Hackathon\biometric"
     DEMOGRAPHIC_DIR = r"C:\Users\User\Desktop\UIDAI Hackathon\demographic"
-    OUTPUT_PATH = r"C:\Users\User\Desktop\UIDAI Hackathon\output\aadhaar_master_dataset.csv"
+    OUTPUT_PATH = r"C:\Users\User\Desktop\UIDAI Hackathon\output\aadhaar_master_dataset.parquet"
+    CACHE_DIR = r"C:\Users\User\Desktop\UIDAI Hackathon\cache"
 
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
 
     master_df = build_master_dataset(
         ENROLMENT_DIR,
         BIOMETRIC_DIR,
-        DEMOGRAPHIC_DIR
+        DEMOGRAPHIC_DIR,
+        CACHE_DIR
     )
 
-    master_df.to_csv(OUTPUT_PATH, index=False)
+    # Parquet keeps the categorical / int32 dtypes for the ML pipeline
+    master_df.to_parquet(
+        OUTPUT_PATH,
+        engine="pyarrow",
+        compression="zstd",
+        index=False
+    )
 
     print("✅ Aadhaar master dataset created successfully")
     print("Rows:", len(master_df))